@@ -0,0 +1,126 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import main  # noqa: E402
+
+
+def activity(version, amount, owner="0xabc"):
+    return {
+        "transaction_version": version,
+        "owner_address": owner,
+        "amount": str(amount),
+        "coin_type": "0x1::aptos_coin::AptosCoin",
+        "activity_type": "0x1::coin::Transfer",
+        "is_gas_fee": False,
+        "is_transaction_success": True,
+        "transaction_timestamp": "2026-10-17T00:00:00",
+        "entry_function_id_str": "0x1::aptos_account::transfer",
+        "event_creation_number": 2,
+        "event_sequence_number": version,
+    }
+
+
+COIN_ACTIVITIES = [
+    activity(101, 50),
+    activity(102, 1000000),
+    activity(103, 1000001, owner="0xdef"),
+    activity(104, 150000000),
+    activity(105, 250000000),
+    activity(106, 250000001, owner="0xdef"),
+    activity(107, 999999999),
+]
+
+
+def matches(row, where):
+    """Evaluate the subset of Hasura `where` syntax the fetchers emit."""
+    for key, condition in where.items():
+        if key == "_and":
+            if not all(matches(row, clause) for clause in condition):
+                return False
+        elif any(op.startswith("_") for op in condition):
+            value = row.get(key)
+            for op, expected in condition.items():
+                if op == "_in":
+                    ok = value in expected
+                else:
+                    left, right = (float(value), float(expected)) if op != "_eq" or key == "amount" \
+                        else (value, expected)
+                    ok = {"_eq": left == right, "_gt": left > right, "_gte": left >= right,
+                          "_lt": left < right, "_lte": left <= right}[op]
+                if not ok:
+                    return False
+        elif not matches(row.get(key) or {}, condition):
+            return False
+    return True
+
+
+class TableCache:
+    """Stands in for the indexer cache, answering specs from an in-memory table."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def query_rows(self, spec, on_row, event_type=None, allow_stale=True):
+        rows = [row for row in self.rows if matches(row, spec["where"])]
+        (field, direction), = spec["order_by"][0].items()
+        rows.sort(key=lambda row: row[field], reverse=direction == "desc")
+        for row in rows[:spec["limit"]]:
+            on_row(row)
+        return True
+
+
+def pipeline(gate_type, gate_data):
+    return main.PipelineData(
+        nodes=[
+            main.Node(id="trigger", type="aptosEventTrigger", position={"x": 0, "y": 0},
+                      data={"eventType": "token_transfer"}),
+            main.Node(id="gate", type=gate_type, position={"x": 1, "y": 0}, data=gate_data),
+            main.Node(id="after", type="timer", position={"x": 2, "y": 0}, data={"delaySeconds": 0}),
+        ],
+        edges=[
+            {"id": "e1", "source": "trigger", "target": "gate"},
+            {"id": "e2", "source": "gate", "target": "after"},
+        ],
+    )
+
+
+async def passed_versions(plan, pushdown):
+    trigger, gate = plan.nodes_by_id["trigger"], plan.nodes_by_id["gate"]
+    event_filter = main.normalize_event_filter(trigger.data)
+    event_filter["pushdown"] = pushdown
+    events = await main.fetch_real_aptos_token_transfers({"transaction_version": 0}, event_filter)
+    prepare = main.prepare_filter_node if gate.type == "filter" else main.prepare_conditional_node
+    predicate = prepare(gate, gate.data)["_predicate"]
+    return {event["transaction_version"] for event in events if predicate(event)}
+
+
+@pytest.mark.parametrize("gate_type, gate_data, pushed", [
+    ("filter", {"filterType": "greater_than", "filterValue": 1000000}, True),
+    ("filter", {"filterField": "data.amount", "filterType": "less_than", "filterValue": "250000000"}, True),
+    ("conditional", {"condition": "greaterEqual", "fieldPath": "data.amount_apt",
+                     "compareValue": "2.5", "dataType": "number"}, True),
+    ("conditional", {"condition": "lessEqual", "fieldPath": "data.amount_apt",
+                     "compareValue": "2.500000005", "dataType": "number"}, True),
+    ("conditional", {"condition": "equals", "fieldPath": "data.amount",
+                     "compareValue": "250000000", "dataType": "number"}, True),
+    ("conditional", {"condition": "equals", "fieldPath": "account_address",
+                     "compareValue": "0xdef", "caseSensitive": True}, True),
+    ("conditional", {"condition": "greater", "fieldPath": "amount",
+                     "compareValue": "1000000", "dataType": "number"}, False),
+    ("filter", {"filterField": "data.amount", "filterType": "equals", "filterValue": "1000000"}, False),
+])
+def test_pushdown_keeps_the_events_the_node_would_pass(monkeypatch, gate_type, gate_data, pushed):
+    monkeypatch.setattr(main, "indexer_cache", TableCache(COIN_ACTIVITIES))
+    plan = main.compile_pipeline(pipeline(gate_type, gate_data))
+    pushdown = main.pushdown_predicates(plan, plan.nodes_by_id["trigger"])
+    assert bool(pushdown) == pushed
+
+    async def scenario():
+        return await passed_versions(plan, pushdown), await passed_versions(plan, [])
+
+    with_pushdown, without_pushdown = asyncio.run(scenario())
+    assert with_pushdown == without_pushdown
@@ -0,0 +1,109 @@
+import asyncio
+import os
+import sys
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import main  # noqa: E402
+
+
+def transaction(version):
+    """A fullnode REST transaction; every tenth version mints two tokens."""
+    events = []
+    if version % 10 == 0:
+        events = [
+            {
+                "type": "0x3::token::MintTokenEvent",
+                "guid": {"creation_number": "4", "account_address": "0xc0ffee"},
+                "sequence_number": "0",
+                "data": {"id": {"name": f"Token #{version}-{n}", "collection": "Stub", "creator": "0xc0ffee"},
+                         "amount": "1"},
+            }
+            for n in range(2)
+        ]
+    return {
+        "type": "user_transaction",
+        "version": str(version),
+        "hash": f"0x{version:x}",
+        "sender": "0xc0ffee",
+        "sequence_number": str(version),
+        "success": True,
+        "timestamp": str(1760659200000000 + version),
+        "gas_used": "10",
+        "payload": {"function": "0x3::token::mint_script", "arguments": [], "type_arguments": []},
+        "events": events,
+    }
+
+
+async def serve_fullnode(state):
+    """Stub fullnode: `/` reports the ledger version, `/transactions` serves version ranges."""
+    async def ledger(request):
+        return web.json_response({"ledger_version": str(state["ledger_version"])})
+
+    async def transactions(request):
+        start, limit = int(request.query["start"]), int(request.query["limit"])
+        state["scans"].append((start, limit))
+        if start in state["failing_chunks"]:
+            return web.json_response({"message": "unavailable"}, status=503)
+        last = min(start + limit - 1, state["ledger_version"])
+        return web.json_response([transaction(version) for version in range(start, last + 1)])
+
+    app = web.Application()
+    app.router.add_get("/", ledger)
+    app.router.add_get("/transactions", transactions)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def test_fullnode_source_scans_chunks_and_never_skips_a_failed_chunk(monkeypatch):
+    monkeypatch.setattr(main, "INDEXER_RETRY_ATTEMPTS", 1)
+    monkeypatch.setattr(main, "FULLNODE_SCAN_CHUNK", 10)
+    monkeypatch.setattr(main, "FULLNODE_SCAN_CONCURRENCY", 2)
+    monkeypatch.setattr(main, "FULLNODE_SEED_VERSIONS", 25)
+    monkeypatch.setattr(main, "FULLNODE_MAX_VERSIONS_PER_POLL", 100)
+    event_filter = main.normalize_event_filter({"eventType": "nft_mint", "dataSource": "fullnode"})
+
+    async def scenario():
+        state = {"ledger_version": 1000, "failing_chunks": set(), "scans": []}
+        runner, endpoint = await serve_fullnode(state)
+        client = main.IndexerHttpClient(endpoint)
+        client.limiter = main.TokenBucket(rate=0, capacity=1)
+        client.breaker = main.CircuitBreaker(failure_threshold=100, reset_seconds=30)
+        source = main.FullnodeEventSource(client)
+        cursor = {"transaction_version": None}
+        try:
+            # Seed: the newest 25 versions in chunks of at most 10
+            events = await source.fetch_events(event_filter, cursor)
+            assert sorted(state["scans"]) == [(976, 10), (986, 10), (996, 5)]
+            assert sorted({event["transaction_version"] for event in events}) == [980, 990, 1000]
+            assert cursor["transaction_version"] == 1000
+
+            # Several mints in one transaction keep distinct dedup keys
+            assert len(events) == 6
+            assert len({main.EventDedupIndex.event_key(event, "trigger") for event in events}) == 6
+            assert all(isinstance(event["sequence_number"], int) for event in events)
+
+            # A failed chunk stops the cursor before it, even though later chunks succeeded
+            state.update(ledger_version=1050, failing_chunks={1021}, scans=[])
+            events = await source.fetch_events(event_filter, cursor)
+            assert sorted(state["scans"]) == [(1001, 10), (1011, 10), (1021, 10), (1031, 10), (1041, 10)]
+            assert sorted({event["transaction_version"] for event in events}) == [1010, 1020]
+            assert cursor["transaction_version"] == 1020
+            assert source.chunks_failed == 1
+
+            # The next poll rescans from the gap
+            state.update(failing_chunks=set(), scans=[])
+            events = await source.fetch_events(event_filter, cursor)
+            assert sorted(state["scans"])[0] == (1021, 10)
+            assert sorted({event["transaction_version"] for event in events}) == [1030, 1040, 1050]
+            assert cursor["transaction_version"] == 1050
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    asyncio.run(scenario())
@@ -0,0 +1,98 @@
+import asyncio
+import os
+import sys
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import main  # noqa: E402
+
+
+async def serve(responses):
+    """Stub endpoint answering POSTs with the next (status, body, delay) from `responses`."""
+    async def handler(request):
+        status, body, delay = responses.pop(0)
+        if delay:
+            await asyncio.sleep(delay)
+        return web.json_response(body, status=status)
+
+    app = web.Application()
+    app.router.add_post("/", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/"
+
+
+def make_client(endpoint):
+    client = main.IndexerHttpClient(endpoint)
+    client.breaker = main.CircuitBreaker(failure_threshold=1, reset_seconds=0.05)
+    client.limiter = main.TokenBucket(rate=0, capacity=1)
+    return client
+
+
+async def open_then_wait(client):
+    client.breaker.record_failure()
+    assert client.breaker.state == "open"
+    await asyncio.sleep(0.06)
+
+
+def test_half_open_probe_answered_with_429_reopens_and_recovers(monkeypatch):
+    monkeypatch.setattr(main, "INDEXER_RETRY_ATTEMPTS", 1)
+
+    async def scenario():
+        runner, endpoint = await serve([(429, {}, 0), (200, {"data": {}}, 0)])
+        client = make_client(endpoint)
+        try:
+            await open_then_wait(client)
+            assert await client.post_graphql({}) is None
+            assert client.breaker.state == "open"
+            assert not client.breaker.probe_in_flight
+
+            await asyncio.sleep(0.06)
+            assert await client.post_graphql({}) == {"data": {}}
+            assert client.breaker.state == "closed"
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    asyncio.run(scenario())
+
+
+def test_half_open_probe_raising_reopens_and_recovers(monkeypatch):
+    monkeypatch.setattr(main, "INDEXER_RETRY_ATTEMPTS", 1)
+
+    async def broken_stream(response):
+        raise main.IndexerStreamError("interrupted")
+
+    async def scenario():
+        runner, endpoint = await serve([(200, {}, 0), (200, {}, 0.5), (200, {"data": {}}, 0)])
+        client = make_client(endpoint)
+        try:
+            await open_then_wait(client)
+            try:
+                await client.post_graphql({}, consume=broken_stream)
+                assert False, "stream error should propagate"
+            except main.IndexerStreamError:
+                pass
+            assert client.breaker.state == "open"
+
+            # A cancelled probe must not hold the breaker half-open either
+            await asyncio.sleep(0.06)
+            probe = asyncio.ensure_future(client.post_graphql({}))
+            await asyncio.sleep(0.1)
+            probe.cancel()
+            await asyncio.gather(probe, return_exceptions=True)
+            assert client.breaker.state == "open"
+            assert not client.breaker.probe_in_flight
+
+            await asyncio.sleep(0.06)
+            assert await client.post_graphql({}) == {"data": {}}
+            assert client.breaker.state == "closed"
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    asyncio.run(scenario())
@@ -0,0 +1,77 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import main  # noqa: E402
+
+
+# Shape emitted by fetch_token_transfer_events
+TRANSFER_EVENT = {
+    "event_type": "token_transfer",
+    "account_address": "0xabc",
+    "transaction_version": 123456,
+    "timestamp": "2026-10-17T00:00:00",
+    "data": {
+        "amount": "250000000",
+        "amount_apt": 2.5,
+        "coin_type": "0x1::aptos_coin::AptosCoin",
+        "activity_type": "0x1::coin::WithdrawEvent",
+        "function_call": "0x1::aptos_account::transfer",
+        "from_address": "0xabc",
+        "to_address": "0xdef",
+    },
+    "type": "0x1::coin::TransferEvent",
+    "sequence_number": 7,
+}
+# Shape emitted for account creations: no amount anywhere
+ACCOUNT_EVENT = {
+    "event_type": "account_created",
+    "transaction_version": 123457,
+    "account_address": "0xabc",
+    "timestamp": "1760659200000000",
+    "data": {"new_account": "0xabc", "creation_time": "1760659200000000", "transaction_fee": "500"},
+    "type": "0x1::account::Account",
+    "sequence_number": "0",
+}
+
+
+def condition(node_data):
+    node = main.Node(id="c", type="conditional", position={"x": 0, "y": 0}, data=node_data)
+    return main.prepare_conditional_node(node, node_data)["_predicate"]
+
+
+def event_filter(node_data):
+    node = main.Node(id="f", type="filter", position={"x": 0, "y": 0}, data=node_data)
+    return main.prepare_filter_node(node, node_data)["_predicate"]
+
+
+def test_form_rule_without_field_reads_data_amount():
+    assert condition({"condition": "greater", "compareValue": "100000000", "dataType": "number"})(TRANSFER_EVENT)
+    assert not condition({"condition": "greater", "compareValue": "300000000", "dataType": "number"})(TRANSFER_EVENT)
+
+
+def test_default_field_falls_back_to_amount_apt():
+    event = {**TRANSFER_EVENT, "data": {"amount_apt": 2.5}}
+    assert condition({"condition": "greaterEqual", "compareValue": "2", "dataType": "number"})(event)
+
+
+def test_legacy_amount_condition_compares_event_amount():
+    assert condition({"condition": "amount > 1000000"})(TRANSFER_EVENT)
+    assert not condition({"condition": "amount < 1000000"})(TRANSFER_EVENT)
+
+
+def test_legacy_and_form_rules_pass_when_the_field_is_missing():
+    assert condition({"condition": "amount > 5"})(ACCOUNT_EVENT)
+    assert condition({"condition": "greater", "compareValue": "5", "dataType": "number"})(ACCOUNT_EVENT)
+    assert event_filter({"filterType": "greater_than", "filterValue": 5})(ACCOUNT_EVENT)
+
+
+def test_filter_with_explicit_path():
+    rule = {"filterField": "data.amount_apt", "filterType": "greater_than", "filterValue": 1, "dataType": "number"}
+    assert event_filter(rule)(TRANSFER_EVENT)
+    assert not event_filter({**rule, "filterValue": 3})(TRANSFER_EVENT)
+
+
+def test_expressions_keep_missing_fields_as_none():
+    assert condition({"expression": "data.amount_apt >= 2"})(TRANSFER_EVENT)
+    assert not condition({"expression": "data.amount_apt >= 2"})(ACCOUNT_EVENT)
@@ -0,0 +1,116 @@
+import asyncio
+import os
+import queue
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import main  # noqa: E402
+
+
+def action_pipeline():
+    return main.PipelineData(
+        nodes=[
+            main.Node(id="trigger", type="aptosEventTrigger", position={"x": 0, "y": 0},
+                      data={"eventType": "token_transfer"}),
+            main.Node(id="action-1", type="aptosAction", position={"x": 1, "y": 0},
+                      data={"actionType": "token_transfer", "amount": "1000"}),
+        ],
+        edges=[{"id": "e1", "source": "trigger", "target": "action-1"}],
+    )
+
+
+class Socketless(main.WebSocketClient):
+    def __init__(self):
+        self.workflow_ids = set()
+        self.message_types = None
+
+
+def test_transaction_request_is_scoped_to_its_workflow(monkeypatch):
+    sent = []
+
+    async def capture(message):
+        sent.append(message)
+
+    monkeypatch.setattr(main, "broadcast_to_websockets", capture)
+    plan = main.compile_pipeline(action_pipeline(), "wf-b")
+    asyncio.run(plan.executors["action-1"]({"data": {}, "account_address": "0xabc"}))
+    request, = [message for message in sent if message["type"] == "execute_transaction"]
+    assert request["workflow_id"] == "wf-b"
+    assert request["node_id"] == "action-1"
+
+    monkeypatch.setitem(main.active_workflows, "wf-a", {"id": "wf-a"})
+    monkeypatch.setitem(main.active_workflows, "wf-b", {"id": "wf-b"})
+    monkeypatch.setattr(main, "workflow_subscribers", {})
+    watching_a, watching_b = Socketless(), Socketless()
+    monkeypatch.setattr(main, "websocket_clients", {"a": watching_a, "b": watching_b})
+    watching_a.subscribe(["wf-a"])
+    watching_b.subscribe(["wf-b"])
+    assert main.websocket_recipients(request) == [watching_b]
+
+
+def test_confirmation_resumes_only_the_matching_workflow(monkeypatch):
+    monkeypatch.setattr(main, "pending_approvals", {})
+    monkeypatch.setattr(main, "workflow_states", {})
+    monkeypatch.setattr(main, "workflow_run_gates", {})
+    monkeypatch.setitem(main.active_workflows, "wf-a", {"id": "wf-a"})
+    monkeypatch.setitem(main.active_workflows, "wf-b", {"id": "wf-b"})
+
+    async def scenario():
+        approval_a = main.request_workflow_approval("wf-a", "action-1")
+        approval_b = main.request_workflow_approval("wf-b", "action-1")
+
+        # Both workflows wait on the same canvas node: a placeholder id is ambiguous
+        assert main.resume_workflow("current_workflow", "action-1", {"transaction_hash": "0x1"}) == []
+        assert not approval_a.done() and not approval_b.done()
+
+        assert main.resume_workflow("wf-b", "action-1", {"transaction_hash": "0x2"}) == ["wf-b"]
+        assert approval_b.result() == {"transaction_hash": "0x2"}
+        assert not approval_a.done()
+
+        # A known workflow without pending approvals never falls through to another one
+        assert main.resume_workflow("wf-b", "action-1") == []
+        assert not approval_a.done()
+
+        # Only one workflow is left waiting on the node, so the placeholder resolves it
+        assert main.resume_workflow("current_workflow", "action-1", {"transaction_hash": "0x3"}) == ["wf-a"]
+        assert approval_a.result() == {"transaction_hash": "0x3"}
+
+    asyncio.run(scenario())
+
+
+def answer_approval_queries(pool, owners_by_worker):
+    """Play the workers: answer each find_approvals command with that worker's owners."""
+    for index, commands in enumerate(pool.commands):
+        while not commands.empty():
+            command = commands.get()
+            if command[0] == "find_approvals":
+                pool.relay.put(("approval_owners", (command[1], owners_by_worker[index])))
+            else:
+                pool.forwarded.append((index, command))
+
+
+def test_worker_pool_routes_placeholder_confirmations_to_a_single_owner():
+    async def confirm(owners_by_worker):
+        pool = main.WorkflowWorkerPool(2)
+        pool.commands = [queue.Queue(), queue.Queue()]
+        pool.relay = queue.Queue()
+        pool.forwarded = []
+        pool.assignments = {"wf-a": 0, "wf-b": 1}
+        pool.relay_task = asyncio.create_task(pool._relay_loop())
+        try:
+            pool.resume_workflow("current_workflow", "action-1", {"transaction_hash": "0x1"})
+            await asyncio.sleep(0.05)
+            answer_approval_queries(pool, owners_by_worker)
+            await asyncio.gather(*pool.background)
+            answer_approval_queries(pool, owners_by_worker)
+            return pool.forwarded
+        finally:
+            pool.relay.put(None)
+            await pool.relay_task
+
+    # Only worker 1 has a workflow waiting on the node: it alone gets the real id
+    forwarded = asyncio.run(confirm([[], ["wf-b"]]))
+    assert forwarded == [(1, ("resume", "wf-b", "action-1", {"transaction_hash": "0x1"}, False))]
+
+    # One workflow per worker waits on the same node: nothing is resumed
+    assert asyncio.run(confirm([["wf-a"], ["wf-b"]])) == []
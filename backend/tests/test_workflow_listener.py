@@ -0,0 +1,50 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import main  # noqa: E402
+
+
+def timer_pipeline(timer_data):
+    return main.PipelineData(
+        nodes=[
+            main.Node(id="trigger", type="aptosEventTrigger", position={"x": 0, "y": 0},
+                      data={"eventType": "token_transfer"}),
+            main.Node(id="timer", type="timer", position={"x": 1, "y": 0}, data=timer_data),
+        ],
+        edges=[{"id": "e1", "source": "trigger", "target": "timer"}],
+    )
+
+
+@pytest.mark.parametrize("timer_data", [{"delay": "", "unit": "seconds"}, {"delay": "soon"}, {"delaySeconds": None}])
+def test_invalid_timer_delay_falls_back_to_default(monkeypatch, timer_data):
+    monkeypatch.setattr(main, "EVENT_EXECUTION_TIMEOUT_SECONDS", 120)
+    pipeline = timer_pipeline(timer_data)
+    plan = main.compile_pipeline(pipeline)
+    assert main.timer_delay_seconds(timer_data) == main.TIMER_DEFAULT_DELAY_SECONDS
+    assert main.event_timeout_for(plan, pipeline) == 120 + main.TIMER_DEFAULT_DELAY_SECONDS
+
+
+def test_listener_setup_failure_unsubscribes_from_poller(monkeypatch):
+    def broken_timeout(plan, pipeline_data):
+        raise ValueError("broken setup")
+
+    monkeypatch.setattr(main, "event_timeout_for", broken_timeout)
+
+    async def scenario():
+        poller = main.SharedIndexerPoller()
+        monkeypatch.setattr(main, "indexer_poller", poller)
+        monkeypatch.setitem(main.active_workflows, "wf", {"id": "wf"})
+        try:
+            pipeline = timer_pipeline({"delaySeconds": 1})
+            await main.workflow_event_listener("wf", pipeline, first_poll_delay=3600)
+            assert poller.groups == {}
+        finally:
+            if poller.task is not None:
+                poller.task.cancel()
+                await asyncio.gather(poller.task, return_exceptions=True)
+
+    asyncio.run(scenario())
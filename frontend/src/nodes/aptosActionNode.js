@@ -152,7 +152,8 @@ export const AptosActionNode = forwardRef(({ id, data }, ref) => {
           ws.onopen = () => {
             const resumeMessage = {
               type: "transaction_confirmed",
-              workflow_id: "current_workflow", // This should be passed dynamically
+              // Echo the workflow that requested the transaction so the backend resumes only it
+              workflow_id: incomingData?.workflowId || "current_workflow",
               transaction_hash: response.hash,
               node_id: id,
               timestamp: new Date().toISOString(),
@@ -263,6 +264,7 @@ export const AptosActionNode = forwardRef(({ id, data }, ref) => {
             recipient: data.recipient,
             amount: data.amount,
             actionType: data.action_type,
+            workflowId: data.workflow_id,
           });
         }
       } catch (error) {
@@ -100,6 +100,17 @@ export const AptosEventTriggerNode = ({ id, data }) => {
           max: 300,
           step: 5,
         },
+        {
+          name: "dataSource",
+          type: "select",
+          label: "Data Source",
+          defaultValue: "indexer",
+          options: [
+            { value: "indexer", label: "GraphQL Indexer" },
+            { value: "fullnode", label: "Fullnode (lower lag)" },
+            { value: "auto", label: "Auto (fullnode when cheap)" },
+          ],
+        },
       ];
 
       // Add event-specific fields based on selection
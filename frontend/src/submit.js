@@ -16,6 +16,8 @@ export const SubmitButton = ({ nodes, edges }) => {
   const [isRunning, setIsRunning] = useState(false);
   const [currentWorkflowId, setCurrentWorkflowId] = useState(null);
   const [validationResults, setValidationResults] = useState(null);
+  // Blank = backend default (base budget plus the pipeline's timer delays)
+  const [eventTimeoutSeconds, setEventTimeoutSeconds] = useState("");
 
   const hasAptosNodes = () => {
     return nodes.some(
@@ -117,7 +119,13 @@ export const SubmitButton = ({ nodes, edges }) => {
         {
           method: "POST",
           headers: { "Content-Type": "application/json" },
-          body: JSON.stringify({ nodes, edges }),
+          body: JSON.stringify({
+            nodes,
+            edges,
+            ...(Number(eventTimeoutSeconds) > 0 && {
+              eventTimeoutSeconds: Number(eventTimeoutSeconds),
+            }),
+          }),
         }
       );
 
@@ -369,6 +377,38 @@ export const SubmitButton = ({ nodes, edges }) => {
           </div>
         )}
 
+      {/* Per-event execution timeout */}
+      {!isRunning && (
+        <label
+          style={{
+            display: "flex",
+            alignItems: "center",
+            justifyContent: "space-between",
+            gap: "8px",
+            marginBottom: "8px",
+            fontSize: "11px",
+            color: "#6b7280",
+          }}
+        >
+          Event timeout (seconds)
+          <input
+            type="number"
+            min={1}
+            step={1}
+            value={eventTimeoutSeconds}
+            placeholder="auto"
+            onChange={(e) => setEventTimeoutSeconds(e.target.value)}
+            style={{
+              width: "90px",
+              padding: "4px 6px",
+              border: "1px solid rgba(107, 114, 128, 0.3)",
+              borderRadius: "6px",
+              fontSize: "11px",
+            }}
+          />
+        </label>
+      )}
+
       {/* Enhanced Main Button */}
       <button
         className={buttonConfig.className}
@@ -96,12 +96,17 @@ export const useWebSocket = (url) => {
 
         ws.current.onmessage = (event) => {
           try {
-            const data = JSON.parse(event.data);
-            console.log("WebSocket message received:", data);
-            setLastMessage(data);
+            const parsed = JSON.parse(event.data);
+            // Batched connections receive an array of messages per frame
+            const messages = Array.isArray(parsed) ? parsed : [parsed];
 
-            // Handle different message types
-            handleMessage(data);
+            messages.forEach((data) => {
+              console.log("WebSocket message received:", data);
+              setLastMessage(data);
+
+              // Handle different message types
+              handleMessage(data);
+            });
           } catch (error) {
             console.error("Error parsing WebSocket message:", error);
           }